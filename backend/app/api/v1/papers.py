@@ -1,22 +1,49 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request
+from starlette.datastructures import State
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List
 from pydantic import BaseModel, Field
 
-from app.core.database import get_db
+from app.core.database import get_db, SessionLocal
 from app.services.search_service import UnifiedSearchService
-from app.utils.cache import CacheService
+from app.utils.cache import CacheService, create_http_cache_storage
 from app.core.config import settings
 
 router = APIRouter(prefix="/papers", tags=["papers"])
 
-# Initialize services (will be properly done in main.py)
-cache_service = CacheService(settings.REDIS_URL)
-search_service = UnifiedSearchService(
-    cache_service=cache_service,
-    semantic_scholar_api_key=getattr(settings, 'SEMANTIC_SCHOLAR_API_KEY', None),
-    openalex_email=getattr(settings, 'OPENALEX_EMAIL', None)
-)
+# Service providers - built once per process in the startup event and kept
+# on app.state, so every request shares the same connection pools
+def init_services(state: State) -> None:
+    """Create the shared cache and search services"""
+    state.cache_service = CacheService(settings.REDIS_URL)
+    state.http_cache_storage = create_http_cache_storage(settings.REDIS_URL, settings.CACHE_TTL)
+    state.search_service = UnifiedSearchService(
+        cache_service=state.cache_service,
+        semantic_scholar_api_key=getattr(settings, 'SEMANTIC_SCHOLAR_API_KEY', None),
+        openalex_email=getattr(settings, 'OPENALEX_EMAIL', None),
+        http_cache_storage=state.http_cache_storage
+    )
+
+
+async def close_services(state: State) -> None:
+    """Release connection pools of the shared services"""
+    await state.search_service.aclose()
+    await state.http_cache_storage.close()
+    await state.cache_service.close()
+
+
+def get_cache_service(request: Request) -> CacheService:
+    return request.app.state.cache_service
+
+
+def get_search_service(request: Request) -> UnifiedSearchService:
+    return request.app.state.search_service
+
+
+async def save_papers_background(search_service: UnifiedSearchService, papers: List[dict]):
+    """Persist search results outside the request with its own DB session"""
+    async with SessionLocal() as db:
+        await search_service.save_papers_to_db(papers, db)
 
 
 # Request/Response Models
@@ -54,11 +81,12 @@ class SearchResponse(BaseModel):
 # Endpoints
 @router.get("/search", response_model=SearchResponse)
 async def search_papers(
+    background_tasks: BackgroundTasks,
     query: str = Query(..., min_length=1, max_length=500, description="Search query"),
     limit: int = Query(50, ge=1, le=100, description="Maximum results"),
     sources: Optional[str] = Query(None, description="Comma-separated sources (arxiv,semantic_scholar,openalex)"),
     use_cache: bool = Query(True, description="Use cached results"),
-    db: Session = Depends(get_db)
+    search_service: UnifiedSearchService = Depends(get_search_service)
 ):
     """
     Search for papers across multiple academic databases
@@ -93,9 +121,10 @@ async def search_papers(
             use_cache=use_cache
         )
         
-        # Save new papers to database (async background task would be better)
-        if results["papers"]:
-            await search_service.save_papers_to_db(results["papers"], db)
+        # Save new papers to database after the response is sent (cached
+        # results were saved when first fetched, and their dates are strings)
+        if results["papers"] and not results["cached"]:
+            background_tasks.add_task(save_papers_background, search_service, results["papers"])
         
         return results
         
@@ -110,7 +139,8 @@ async def search_papers(
 async def get_paper_by_id(
     source: str,
     paper_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    search_service: UnifiedSearchService = Depends(get_search_service)
 ):
     """
     Get a specific paper by its ID from a source
@@ -151,12 +181,54 @@ async def get_paper_by_id(
         )
 
 
+@router.get("/batch/{source}")
+async def get_papers_by_ids(
+    source: str,
+    ids: str = Query(..., min_length=1, description="Comma-separated source-specific paper IDs"),
+    db: AsyncSession = Depends(get_db),
+    search_service: UnifiedSearchService = Depends(get_search_service)
+):
+    """
+    Get several papers by ID from a source in one call
+    
+    **Example:**
+    ```
+    GET /api/v1/papers/batch/openalex?ids=W2741809807,W2100837269
+    ```
+    """
+    valid_sources = {"arxiv", "semantic_scholar", "openalex"}
+    if source not in valid_sources:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid source. Valid options: {valid_sources}"
+        )
+    
+    paper_ids = [i.strip() for i in ids.split(",") if i.strip()]
+    if len(paper_ids) > 100:
+        raise HTTPException(
+            status_code=400,
+            detail="Too many IDs (max 100)"
+        )
+    
+    try:
+        papers = await search_service.get_papers_by_ids(paper_ids, source, db)
+        return {
+            "papers": papers,
+            "missing": [i for i in paper_ids if i not in papers]
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to fetch papers: {str(e)}"
+        )
+
+
 @router.get("/health")
-async def health_check():
+async def health_check(cache_service: CacheService = Depends(get_cache_service)):
     """Check if search services are operational"""
     return {
         "status": "healthy",
-        "redis_connected": cache_service.is_connected(),
+        "redis_connected": await cache_service.is_connected(),
         "services": {
             "arxiv": "operational",
             "semantic_scholar": "operational",
@@ -166,7 +238,7 @@ async def health_check():
 
 
 @router.delete("/cache")
-async def clear_cache():
+async def clear_cache(cache_service: CacheService = Depends(get_cache_service)):
     """Clear search cache (admin endpoint - add auth later)"""
     try:
         success = await cache_service.clear_all()
@@ -182,25 +254,29 @@ async def clear_cache():
 
 
 @router.get("/stats")
-async def get_search_stats(db: Session = Depends(get_db)):
+async def get_search_stats(db: AsyncSession = Depends(get_db)):
     """Get statistics about papers in the database"""
     from app.models.paper import Paper
-    from sqlalchemy import func
+    from sqlalchemy import func, select
     
     try:
-        total_papers = db.query(func.count(Paper.id)).scalar()
+        total_papers = await db.scalar(select(func.count(Paper.id)))
+        
+        papers_by_source = await db.execute(
+            select(
+                Paper.source,
+                func.count(Paper.id)
+            ).group_by(Paper.source)
+        )
         
-        papers_by_source = db.query(
-            Paper.source,
-            func.count(Paper.id)
-        ).group_by(Paper.source).all()
+        processed_papers = await db.scalar(
+            select(func.count(Paper.id)).where(Paper.is_processed == True)
+        )
         
         return {
             "total_papers": total_papers,
-            "by_source": {source: count for source, count in papers_by_source},
-            "processed_papers": db.query(func.count(Paper.id)).filter(
-                Paper.is_processed == True
-            ).scalar()
+            "by_source": {source: count for source, count in papers_by_source.all()},
+            "processed_papers": processed_papers
         }
     except Exception as e:
         raise HTTPException(
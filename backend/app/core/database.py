@@ -0,0 +1,30 @@
+from typing import AsyncGenerator
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
+from app.core.config import settings
+
+# Async engine on asyncpg so DB I/O doesn't block the event loop
+engine = create_async_engine(
+    settings.DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1),
+    pool_size=20,
+    max_overflow=10,
+    pool_pre_ping=True
+)
+
+SessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+
+Base = declarative_base()
+
+
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
+    """Yield a database session for the duration of a request"""
+    async with SessionLocal() as db:
+        yield db
+
+
+async def init_db():
+    """Create database tables"""
+    from app.models import paper  # noqa: F401 - register models on Base.metadata
+    
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
@@ -1,5 +1,10 @@
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from app.core.config import settings
 from app.core.database import init_db
 from app.api.v1 import papers
@@ -10,7 +15,8 @@ app = FastAPI(
     version=settings.VERSION,
     description="AI-powered research paper search platform",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -23,15 +29,49 @@ app.add_middleware(
 )
 
 
+# Writes log records on a background thread, set up at startup
+log_listener: Optional[QueueListener] = None
+
+
+def start_log_listener() -> QueueListener:
+    """Route root logging through a queue so request handlers never block on log I/O"""
+    root = logging.getLogger()
+    handlers = root.handlers
+    if not handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+        handlers = [handler]
+    
+    log_queue = queue.SimpleQueue()
+    root.handlers = [QueueHandler(log_queue)]
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
 # Startup event
 @app.on_event("startup")
 async def startup_event():
     """Initialize services on startup"""
+    global log_listener
+    log_listener = start_log_listener()
     print("🚀 Starting Research Paper Search API...")
-    init_db()
+    await init_db()
+    papers.init_services(app.state)
     print("✅ Application ready!")
 
 
+# Shutdown event
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release pooled connections on shutdown"""
+    await papers.close_services(app.state)
+    
+    # Flush queued log records
+    if log_listener is not None:
+        log_listener.stop()
+
+
 # Root endpoint
 @app.get("/")
 async def root():
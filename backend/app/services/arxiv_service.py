@@ -1,16 +1,35 @@
-import httpx
+import io
+import logging
+import re
 import xml.etree.ElementTree as ET
 from typing import List, Dict, Any, Optional
 from datetime import datetime
-from app.services.base_source import PaperSource
+from app.services.base_source import AsyncBaseStorage, PaperSource
+
+logger = logging.getLogger(__name__)
+
+# Fully-qualified Atom tags (ElementTree reports tags as '{namespace}local')
+_ATOM = "{http://www.w3.org/2005/Atom}"
+ATOM_ENTRY = f"{_ATOM}entry"
+ATOM_ID = f"{_ATOM}id"
+ATOM_TITLE = f"{_ATOM}title"
+ATOM_SUMMARY = f"{_ATOM}summary"
+ATOM_AUTHOR = f"{_ATOM}author"
+ATOM_NAME = f"{_ATOM}name"
+ATOM_PUBLISHED = f"{_ATOM}published"
+ATOM_UPDATED = f"{_ATOM}updated"
+ATOM_LINK = f"{_ATOM}link"
+
+_VERSION_RE = re.compile(r"v\d+$")
 
 class ArxivService(PaperSource):
     """arXiv API service for searching papers"""
     
     BASE_URL = "http://export.arxiv.org/api/query"
+    BATCH_SIZE = 100  # IDs per id_list request
     
-    def __init__(self):
-        super().__init__()
+    def __init__(self, http_cache_storage: Optional[AsyncBaseStorage] = None):
+        super().__init__(http_cache_storage=http_cache_storage)
         self.source_name = "arxiv"
     
     async def search(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
@@ -24,15 +43,13 @@ class ArxivService(PaperSource):
         }
         
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(self.BASE_URL, params=params)
-                response.raise_for_status()
-                
-                papers = self._parse_arxiv_xml(response.text)
-                return [self.normalize_paper(paper) for paper in papers]
-                
-        except Exception as e:
-            print(f"arXiv search error: {str(e)}")
+            response = await self._request("GET", self.BASE_URL, params=params)
+            
+            papers = self._parse_arxiv_xml(response.content)
+            return [self.normalize_paper(paper) for paper in papers]
+            
+        except Exception:
+            logger.warning("arXiv search error", exc_info=True)
             return []
     
     async def get_paper_by_id(self, arxiv_id: str) -> Optional[Dict[str, Any]]:
@@ -43,59 +60,89 @@ class ArxivService(PaperSource):
         }
         
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(self.BASE_URL, params=params)
-                response.raise_for_status()
-                
-                papers = self._parse_arxiv_xml(response.text)
-                if papers:
-                    return self.normalize_paper(papers[0])
-                return None
-                
-        except Exception as e:
-            print(f"arXiv get paper error: {str(e)}")
+            response = await self._request("GET", self.BASE_URL, params=params)
+            
+            papers = self._parse_arxiv_xml(response.content)
+            if papers:
+                return self.normalize_paper(papers[0])
             return None
+            
+        except Exception:
+            logger.warning("arXiv get paper error", exc_info=True)
+            return None
+    
+    async def get_papers_by_ids(self, arxiv_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get papers by arXiv IDs, many per id_list request"""
+        papers = {}
+        # One request at a time - arXiv asks clients not to hit the API in parallel
+        for i in range(0, len(arxiv_ids), self.BATCH_SIZE):
+            chunk = arxiv_ids[i:i + self.BATCH_SIZE]
+            params = {
+                "id_list": ",".join(chunk),
+                "max_results": len(chunk)
+            }
+            
+            # Entries come back versioned (e.g. 1706.03762v7); map them to
+            # the requested IDs, which may or may not carry a version
+            requested = {arxiv_id: arxiv_id for arxiv_id in chunk}
+            for arxiv_id in chunk:
+                requested.setdefault(_VERSION_RE.sub("", arxiv_id), arxiv_id)
+            
+            try:
+                response = await self._request("GET", self.BASE_URL, params=params)
+                
+                for raw in self._parse_arxiv_xml(response.content):
+                    arxiv_id = requested.get(raw["id"]) or requested.get(_VERSION_RE.sub("", raw["id"]))
+                    if arxiv_id:
+                        papers[arxiv_id] = self.normalize_paper(raw)
+                        
+            except Exception:
+                logger.warning("arXiv batch get error", exc_info=True)
+        
+        return papers
     
-    def _parse_arxiv_xml(self, xml_content: str) -> List[Dict[str, Any]]:
+    def _parse_arxiv_xml(self, xml_content: bytes) -> List[Dict[str, Any]]:
         """Parse arXiv API XML response"""
         papers = []
         
         try:
-            root = ET.fromstring(xml_content)
-            ns = {'atom': 'http://www.w3.org/2005/Atom'}
-            
-            for entry in root.findall('atom:entry', ns):
+            # Stream entries and free each one once read, instead of building the whole tree
+            for _, entry in ET.iterparse(io.BytesIO(xml_content), events=("end",)):
+                if entry.tag != ATOM_ENTRY:
+                    continue
+                
                 paper = {
-                    'id': entry.find('atom:id', ns).text.split('/abs/')[-1],
-                    'title': entry.find('atom:title', ns).text.strip().replace('\n', ' '),
-                    'summary': entry.find('atom:summary', ns).text.strip().replace('\n', ' '),
+                    'id': entry.find(ATOM_ID).text.split('/abs/')[-1],
+                    'title': entry.find(ATOM_TITLE).text.strip().replace('\n', ' '),
+                    'summary': entry.find(ATOM_SUMMARY).text.strip().replace('\n', ' '),
                     'authors': [
-                        author.find('atom:name', ns).text 
-                        for author in entry.findall('atom:author', ns)
+                        author.find(ATOM_NAME).text
+                        for author in entry.iterfind(ATOM_AUTHOR)
                     ],
-                    'published': entry.find('atom:published', ns).text,
-                    'updated': entry.find('atom:updated', ns).text,
+                    'published': entry.find(ATOM_PUBLISHED).text,
+                    'updated': entry.find(ATOM_UPDATED).text,
                     'pdf_url': None,
                     'doi': None
                 }
                 
                 # Get PDF link
-                for link in entry.findall('atom:link', ns):
+                for link in entry.iterfind(ATOM_LINK):
                     if link.get('title') == 'pdf':
                         paper['pdf_url'] = link.get('href')
                     elif link.get('title') == 'doi':
                         paper['doi'] = link.get('href')
                 
                 papers.append(paper)
+                entry.clear()
                 
-        except Exception as e:
-            print(f"XML parsing error: {str(e)}")
+        except Exception:
+            logger.warning("XML parsing error", exc_info=True)
         
         return papers
     
     def normalize_paper(self, raw_data: Dict[str, Any]) -> Dict[str, Any]:
         """Convert arXiv format to standard format"""
-        return {
+        paper = {
             "title": raw_data.get("title", ""),
             "abstract": raw_data.get("summary", ""),
             "authors": raw_data.get("authors", []),
@@ -107,4 +154,6 @@ class ArxivService(PaperSource):
             "doi": raw_data.get("doi"),
             "citation_count": 0,  # arXiv doesn't provide citation counts
             "venue": None
-        }
\ No newline at end of file
+        }
+        paper["_key"] = self._dedup_key(paper)
+        return paper
\ No newline at end of file
@@ -1,12 +1,181 @@
+import asyncio
+import hashlib
+import random
+import re
+import httpcore
+import httpx
+import hishel
+from hishel._async._storages import AsyncBaseStorage  # Not exported at the package top level
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable, Sequence, Tuple, Union
 from datetime import datetime
 
+_DATE_RE = re.compile(r"(\d{4})(?:-(\d{2}))?(?:-(\d{2}))?")
+
+
+def compile_field_extractor(
+    name: str,
+    fields: Sequence[Tuple[str, Union[str, Tuple[str, ...]], Any]],
+    strict: bool = False
+) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Generate a function that copies fields out of a raw API record
+    
+    Each (output_key, path, default) becomes one entry of a single dict
+    literal. A path is a key or a tuple of nested keys; missing or null
+    intermediate objects yield the default. Built once per schema so
+    normalization pays no per-field helper calls.
+    
+    With strict=True the record is trusted to follow a fixed schema: keys
+    of the record itself are indexed directly, so a missing one raises
+    KeyError (and a non-dict record TypeError) for the caller to fall back
+    on. Null nested objects still yield the default.
+    
+    Args:
+        name: Name of the generated function (shows up in tracebacks)
+        fields: (output_key, path, default) triples
+        strict: Index top-level keys instead of using .get()
+        
+    Returns:
+        Function taking the raw record and returning the extracted dict
+    """
+    entries = []
+    for out_key, path, default in fields:
+        keys = (path,) if isinstance(path, str) else tuple(path)
+        if strict:
+            expr = f"d[{keys[0]!r}]"
+            keys = keys[1:]
+            if keys:
+                expr = f"({expr} or {{}})"
+        else:
+            expr = "d"
+        for key in keys[:-1]:
+            expr = f"({expr}.get({key!r}) or {{}})"
+        if keys:
+            expr = f"{expr}.get({keys[-1]!r}, {default!r})"
+        entries.append(f"        {out_key!r}: {expr},")
+    
+    source = "\n".join([f"def {name}(d):", "    return {", *entries, "    }"])
+    namespace: Dict[str, Any] = {}
+    exec(compile(source, f"<{name}>", "exec"), namespace)
+    return namespace[name]
+
+
+class _ForceCacheController(hishel.Controller):
+    """
+    Cache controller that stores and reuses successful responses whatever
+    their Cache-Control headers say
+    
+    Only cacheable statuses (200, 301, 308) are stored, so a rate-limit or
+    server error is never replayed from the cache.
+    """
+    
+    def is_cachable(self, request: httpcore.Request, response: httpcore.Response) -> bool:
+        return (
+            request.method.decode("ascii") in self._cacheable_methods
+            and response.status in self._cacheable_status_codes
+        )
+    
+    def construct_response_from_cache(
+        self,
+        request: httpcore.Request,
+        response: httpcore.Response,
+        original_request: httpcore.Request
+    ) -> httpcore.Response:
+        # Stored responses are used until the storage TTL expires them
+        return response
+
+
 class PaperSource(ABC):
     """Abstract base class for paper search sources"""
     
-    def __init__(self):
+    USER_AGENT = "paper-search/1.0"
+    FORCE_HTTP_CACHE = False  # Cache successful responses regardless of Cache-Control headers
+    MAX_CONCURRENCY = 5  # In-flight requests per source
+    MAX_RETRIES = 3
+    MAX_RETRY_DELAY = 10.0  # Seconds
+    RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+    CLIENT_LIMITS = httpx.Limits(max_keepalive_connections=32, max_connections=64)
+    CLIENT_TIMEOUT = httpx.Timeout(30.0)
+    
+    def __init__(
+        self,
+        contact_email: Optional[str] = None,
+        http_cache_storage: Optional[AsyncBaseStorage] = None,
+        headers: Optional[Dict[str, str]] = None,
+        base_url: str = ""
+    ):
         self.source_name = self.__class__.__name__.replace('Service', '').lower()
+        
+        # Identify ourselves; a mailto puts us in the "polite pool" of APIs that support it
+        user_agent = self.USER_AGENT
+        if contact_email:
+            user_agent = f"{user_agent} (mailto:{contact_email})"
+        
+        # One long-lived client per source so requests reuse keep-alive connections
+        client_kwargs = dict(
+            base_url=base_url,
+            http2=True,
+            limits=self.CLIENT_LIMITS,
+            timeout=self.CLIENT_TIMEOUT,
+            headers={"User-Agent": user_agent, **(headers or {})}
+        )
+        
+        if http_cache_storage is not None:
+            # Cache raw provider responses so repeat lookups skip the upstream API
+            if self.FORCE_HTTP_CACHE:
+                controller = _ForceCacheController()
+            else:
+                controller = hishel.Controller()
+            self._client = hishel.AsyncCacheClient(
+                storage=http_cache_storage,
+                controller=controller,
+                **client_kwargs
+            )
+        else:
+            self._client = httpx.AsyncClient(**client_kwargs)
+        
+        self._semaphore = asyncio.Semaphore(self.MAX_CONCURRENCY)
+    
+    async def aclose(self):
+        """Close the underlying HTTP connection pool"""
+        await self._client.aclose()
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+    
+    async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        Send a request through the shared client
+        
+        Caps in-flight requests per source and retries rate-limited or
+        failing upstream responses with exponential backoff, honoring
+        Retry-After when the API sends it.
+        
+        Raises:
+            httpx.HTTPStatusError: On a non-retryable error status, or once retries are exhausted
+        """
+        for attempt in range(1, self.MAX_RETRIES + 1):
+            async with self._semaphore:
+                response = await self._client.request(method, url, **kwargs)
+            
+            if response.status_code not in self.RETRY_STATUS_CODES or attempt == self.MAX_RETRIES:
+                response.raise_for_status()
+                return response
+            
+            await asyncio.sleep(self._retry_delay(response, attempt))
+    
+    def _retry_delay(self, response: httpx.Response, attempt: int) -> float:
+        """Seconds to wait before retrying a failed response"""
+        retry_after = response.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return min(float(retry_after), self.MAX_RETRY_DELAY)
+        
+        # Exponential backoff with jitter
+        return min(2 ** (attempt - 1) + random.random(), self.MAX_RETRY_DELAY)
     
     @abstractmethod
     async def search(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
@@ -35,6 +204,30 @@ class PaperSource(ABC):
         """
         pass
     
+    async def get_papers_by_ids(self, paper_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get several papers by their IDs
+        
+        Sources with a batch endpoint override this; the default issues the
+        single-paper lookups concurrently (bounded by MAX_CONCURRENCY in
+        _request) over the shared connection pool.
+        
+        Args:
+            paper_ids: Source-specific paper identifiers
+            
+        Returns:
+            Mapping of requested ID to paper dictionary (missing IDs are omitted)
+        """
+        results = await asyncio.gather(
+            *(self.get_paper_by_id(paper_id) for paper_id in paper_ids),
+            return_exceptions=True
+        )
+        return {
+            paper_id: paper
+            for paper_id, paper in zip(paper_ids, results)
+            if isinstance(paper, dict)
+        }
+    
     def normalize_paper(self, raw_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Convert source-specific format to standardized format
@@ -50,11 +243,23 @@ class PaperSource(ABC):
             "source_id": str,
             "doi": str or None,
             "citation_count": int,
-            "venue": str or None
+            "venue": str or None,
+            "_key": str or None  # see _dedup_key
         }
         """
         raise NotImplementedError("Each source must implement normalize_paper")
     
+    def _dedup_key(self, paper: Dict[str, Any]) -> Optional[str]:
+        """Cheap identity key for deduplication: DOI, else arXiv ID, else a title hash"""
+        for id_field in ("doi", "arxiv_id"):
+            if paper.get(id_field):
+                return paper[id_field].lower().strip()
+        
+        title = (paper.get("title") or "").lower().strip()
+        if not title:
+            return None
+        return hashlib.blake2b(title.encode(), digest_size=8).hexdigest()
+    
     def _safe_get(self, data: Dict, *keys, default=None):
         """Safely get nested dictionary values"""
         for key in keys:
@@ -69,13 +274,13 @@ class PaperSource(ABC):
         if not date_str:
             return None
         
-        try:
-            # Try common formats
-            for fmt in ["%Y-%m-%d", "%Y-%m", "%Y"]:
-                try:
-                    return datetime.strptime(str(date_str)[:10], fmt)
-                except ValueError:
-                    continue
+        # YYYY, YYYY-MM or YYYY-MM-DD (anything after, e.g. a time, is ignored)
+        match = _DATE_RE.match(str(date_str))
+        if not match:
             return None
-        except Exception:
+        
+        year, month, day = match.groups()
+        try:
+            return datetime(int(year), int(month or 1), int(day or 1))
+        except ValueError:
             return None
\ No newline at end of file
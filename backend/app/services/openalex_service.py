@@ -1,14 +1,35 @@
-import httpx
+import logging
 from typing import List, Dict, Any, Optional
-from app.services.base_source import PaperSource
+from app.services.base_source import AsyncBaseStorage, PaperSource, compile_field_extractor
+
+logger = logging.getLogger(__name__)
+
+# Work fields that need no processing, compiled into one dict-building function
+_extract_work_fields = compile_field_extractor("_extract_work_fields", [
+    ("title", "title", ""),
+    ("pdf_url", ("best_oa_location", "pdf_url"), None),
+    ("venue", ("primary_location", "source", "display_name"), None),
+    ("citation_count", "cited_by_count", 0),
+])
 
 class OpenAlexService(PaperSource):
     """OpenAlex API service"""
     
     BASE_URL = "https://api.openalex.org"
+    BATCH_SIZE = 50  # Max values in a single OR filter
+    FORCE_HTTP_CACHE = True  # Responses carry no useful Cache-Control headers
+    # Only the fields normalize_paper reads - full work objects are much larger
+    SELECT_FIELDS = (
+        "id,doi,title,publication_date,authorships,primary_location,"
+        "best_oa_location,cited_by_count,ids,abstract_inverted_index"
+    )
     
-    def __init__(self, email: Optional[str] = None):
-        super().__init__()
+    def __init__(
+        self,
+        email: Optional[str] = None,
+        http_cache_storage: Optional[AsyncBaseStorage] = None
+    ):
+        super().__init__(contact_email=email, http_cache_storage=http_cache_storage)
         self.source_name = "openalex"
         self.email = email  # Polite pool access (faster rate limits)
     
@@ -19,21 +40,20 @@ class OpenAlexService(PaperSource):
             "search": query,
             "per_page": min(limit, 200),  # API max is 200
             "sort": "relevance_score:desc",
+            "select": self.SELECT_FIELDS,
             "mailto": self.email  # For polite pool
         }
         
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(url, params=params)
-                response.raise_for_status()
-                
-                data = response.json()
-                papers = data.get("results", [])
-                
-                return [self.normalize_paper(paper) for paper in papers if paper]
-                
-        except Exception as e:
-            print(f"OpenAlex search error: {str(e)}")
+            response = await self._request("GET", url, params=params)
+            
+            data = response.json()
+            papers = data.get("results", [])
+            
+            return [self.normalize_paper(paper) for paper in papers if paper]
+            
+        except Exception:
+            logger.warning("OpenAlex search error", exc_info=True)
             return []
     
     async def get_paper_by_id(self, openalex_id: str) -> Optional[Dict[str, Any]]:
@@ -43,68 +63,94 @@ class OpenAlexService(PaperSource):
             openalex_id = f"W{openalex_id}"
         
         url = f"{self.BASE_URL}/works/{openalex_id}"
-        params = {"mailto": self.email}
+        params = {"select": self.SELECT_FIELDS, "mailto": self.email}
         
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(url, params=params)
-                response.raise_for_status()
-                
-                paper = response.json()
-                return self.normalize_paper(paper)
-                
-        except Exception as e:
-            print(f"OpenAlex get paper error: {str(e)}")
+            response = await self._request("GET", url, params=params)
+            
+            paper = response.json()
+            return self.normalize_paper(paper)
+            
+        except Exception:
+            logger.warning("OpenAlex get paper error", exc_info=True)
             return None
     
+    async def get_papers_by_ids(self, openalex_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get papers by OpenAlex IDs, batching up to 50 IDs per request"""
+        url = f"{self.BASE_URL}/works"
+        
+        # Map normalized 'W...' IDs back to the IDs the caller asked for
+        requested = {
+            (oid if oid.startswith("W") else f"W{oid}"): oid
+            for oid in openalex_ids
+        }
+        ids = list(requested)
+        
+        papers = {}
+        for i in range(0, len(ids), self.BATCH_SIZE):
+            chunk = ids[i:i + self.BATCH_SIZE]
+            params = {
+                "filter": f"openalex_id:{'|'.join(chunk)}",
+                "per_page": self.BATCH_SIZE,
+                "select": self.SELECT_FIELDS,
+                "mailto": self.email
+            }
+            
+            try:
+                response = await self._request("GET", url, params=params)
+                
+                for raw in response.json().get("results", []):
+                    if not raw:
+                        continue
+                    paper = self.normalize_paper(raw)
+                    if paper["openalex_id"] in requested:
+                        papers[requested[paper["openalex_id"]]] = paper
+                        
+            except Exception:
+                logger.warning("OpenAlex batch get error", exc_info=True)
+        
+        return papers
+    
     def normalize_paper(self, raw_data: Dict[str, Any]) -> Dict[str, Any]:
         """Convert OpenAlex format to standard format"""
+        # Flat and nested fields that are copied as-is
+        paper = _extract_work_fields(raw_data)
+        
         # Extract IDs
         openalex_id = raw_data.get("id", "").split("/")[-1]
-        doi = raw_data.get("doi", "").replace("https://doi.org/", "") if raw_data.get("doi") else None
-        
-        # Extract arXiv ID from IDs array
-        arxiv_id = None
-        for ext_id in raw_data.get("ids", {}).values():
-            if isinstance(ext_id, str) and "arxiv" in ext_id.lower():
-                arxiv_id = ext_id.split("/")[-1]
-                break
+        doi = raw_data.get("doi")
         
-        # Extract PDF URL
-        pdf_url = None
-        best_oa = raw_data.get("best_oa_location")
-        if best_oa and isinstance(best_oa, dict):
-            pdf_url = best_oa.get("pdf_url")
+        # Extract arXiv ID from IDs object
+        arxiv_url = (raw_data.get("ids") or {}).get("arxiv")
         
         # Extract authors
         authors = []
         for authorship in raw_data.get("authorships", []):
-            author = authorship.get("author", {})
-            if author and isinstance(author, dict):
+            author = authorship.get("author")
+            if author:
                 authors.append(author.get("display_name", "Unknown"))
         
-        # Extract venue/journal
-        venue = None
-        primary_location = raw_data.get("primary_location", {})
-        if primary_location and isinstance(primary_location, dict):
-            source = primary_location.get("source", {})
-            if source and isinstance(source, dict):
-                venue = source.get("display_name")
-        
-        # Parse publication date
-        pub_date = self._parse_date(raw_data.get("publication_date"))
+        paper["abstract"] = self._decode_inverted_index(raw_data.get("abstract_inverted_index"))
+        paper["authors"] = authors
+        paper["publication_date"] = self._parse_date(raw_data.get("publication_date"))
+        paper["source"] = "openalex"
+        paper["source_id"] = openalex_id
+        paper["openalex_id"] = openalex_id
+        paper["arxiv_id"] = arxiv_url.rsplit("/", 1)[-1] if arxiv_url else None
+        paper["doi"] = doi.replace("https://doi.org/", "") if doi else None
+        paper["_key"] = self._dedup_key(paper)
+        return paper
+    
+    @staticmethod
+    def _decode_inverted_index(inverted_index: Optional[Dict[str, List[int]]]) -> str:
+        """Rebuild abstract text from OpenAlex's {word: [positions]} index"""
+        if not inverted_index:
+            return ""
         
-        return {
-            "title": raw_data.get("title", ""),
-            "abstract": self._safe_get(raw_data, "abstract_inverted_index") or "",  # Note: needs processing
-            "authors": authors,
-            "publication_date": pub_date,
-            "pdf_url": pdf_url,
-            "source": "openalex",
-            "source_id": openalex_id,
-            "openalex_id": openalex_id,
-            "arxiv_id": arxiv_id,
-            "doi": doi,
-            "citation_count": raw_data.get("cited_by_count", 0),
-            "venue": venue
-        }
\ No newline at end of file
+        # Scatter each word into a pre-sized slot list, then join once
+        size = 1 + max((pos for positions in inverted_index.values() for pos in positions), default=-1)
+        words = [""] * size
+        for word, positions in inverted_index.items():
+            for pos in positions:
+                words[pos] = word
+        return " ".join(words)
\ No newline at end of file
@@ -1,8 +1,14 @@
 import asyncio
-from typing import List, Dict, Any, Optional
-from sqlalchemy.orm import Session
+import heapq
+import logging
+from typing import List, Dict, Any, Optional, Tuple
+from sqlalchemy import or_, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
+from operator import itemgetter
 
+from app.services.base_source import AsyncBaseStorage
 from app.services.arxiv_service import ArxivService
 from app.services.semantic_scholar_service import SemanticScholarService
 from app.services.openalex_service import OpenAlexService
@@ -10,25 +16,46 @@ from app.utils.deduplication import deduplicate_papers
 from app.utils.cache import CacheService
 from app.models.paper import Paper
 
+logger = logging.getLogger(__name__)
+
 
 class UnifiedSearchService:
     """Unified search service that queries multiple sources"""
     
+    SOFT_TIMEOUT = 3.0  # Seconds to wait for all sources
+    SEARCH_TIMEOUT = 30.0  # Hard limit for the whole fan-out
+    MIN_SOURCES = 2  # Sources needed to return after the soft timeout
+    CACHE_HEAD_START = 0.02  # Seconds the cache lookup gets before the fan-out starts
+    
     def __init__(
         self,
         cache_service: CacheService,
         semantic_scholar_api_key: Optional[str] = None,
-        openalex_email: Optional[str] = None
+        openalex_email: Optional[str] = None,
+        http_cache_storage: Optional[AsyncBaseStorage] = None
     ):
         """Initialize all search services"""
         self.cache = cache_service
         
         # Initialize source services
-        self.arxiv = ArxivService()
-        self.semantic_scholar = SemanticScholarService(api_key=semantic_scholar_api_key)
-        self.openalex = OpenAlexService(email=openalex_email)
+        self.arxiv = ArxivService(http_cache_storage=http_cache_storage)
+        self.semantic_scholar = SemanticScholarService(
+            api_key=semantic_scholar_api_key,
+            http_cache_storage=http_cache_storage
+        )
+        self.openalex = OpenAlexService(
+            email=openalex_email,
+            http_cache_storage=http_cache_storage
+        )
         
         self.sources = [self.arxiv, self.semantic_scholar, self.openalex]
+        
+        # Searches currently running, so concurrent identical queries share one fan-out
+        self._inflight: Dict[tuple, asyncio.Task] = {}
+    
+    async def aclose(self):
+        """Close the HTTP connection pools held by each source"""
+        await asyncio.gather(*(source.aclose() for source in self.sources))
     
     async def search(
         self,
@@ -55,28 +82,79 @@ class UnifiedSearchService:
                 "cached": bool
             }
         """
-        # Check cache first
-        if use_cache:
-            cached = await self.cache.get_search_results(query, limit)
-            if cached:
-                cached["cached"] = True
-                return cached
-        
         # Determine which sources to use
         active_sources = self._get_active_sources(sources)
         
+        # Join an identical search that is already running instead of
+        # hitting the upstream APIs again
+        key = (query, limit, tuple(s.source_name for s in active_sources), use_cache)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._search(query, limit, active_sources, use_cache))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        
+        # Shield so one client disconnecting doesn't cancel the search for the others
+        return await asyncio.shield(task)
+    
+    async def _search(
+        self,
+        query: str,
+        limit: int,
+        active_sources: List[Any],
+        use_cache: bool
+    ) -> Dict[str, Any]:
+        """Run a search: cache lookup, source fan-out, dedup and ranking"""
         # Search all sources in parallel
-        results = await self._parallel_search(query, limit, active_sources)
+        if use_cache:
+            # Give the cache a head start so hits never reach the upstream
+            # APIs (and their rate limits)
+            cache_task = asyncio.create_task(self.cache.get_search_results(query, limit))
+            await asyncio.wait({cache_task}, timeout=self.CACHE_HEAD_START)
+            
+            if cache_task.done():
+                fanout_task = None
+            else:
+                # Slow cache - race it against the external searches so it
+                # doesn't hold up a miss
+                fanout_task = asyncio.create_task(self._parallel_search(query, limit, active_sources))
+                await asyncio.wait(
+                    {cache_task, fanout_task},
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+            
+            if cache_task.done():
+                cached = cache_task.result()
+                if cached:
+                    if fanout_task is not None:
+                        fanout_task.cancel()
+                    cached["cached"] = True
+                    return cached
+            else:
+                cache_task.cancel()
+            
+            if fanout_task is None:
+                results, complete = await self._parallel_search(query, limit, active_sources)
+            else:
+                results, complete = await fanout_task
+        else:
+            results, complete = await self._parallel_search(query, limit, active_sources)
         
         # Deduplicate papers
         deduplicated = deduplicate_papers(results)
         
-        # Sort by relevance (citation count as proxy)
-        sorted_papers = sorted(
+        # Coerce citation counts once so the ranking key is a plain lookup,
+        # and drop the dedup key - it's internal and mustn't reach clients or the cache
+        for paper in deduplicated:
+            paper["citation_count"] = paper.get("citation_count") or 0
+            paper.pop("_key", None)
+        
+        # Top-k by relevance (citation count as proxy)
+        sorted_papers = heapq.nlargest(
+            limit,
             deduplicated,
-            key=lambda p: p.get("citation_count", 0),
-            reverse=True
-        )[:limit]
+            key=itemgetter("citation_count")
+        )
         
         # Prepare response
         response = {
@@ -87,8 +165,8 @@ class UnifiedSearchService:
             "cached": False
         }
         
-        # Cache results
-        if use_cache:
+        # Cache results (partial results would hide the slow sources for the whole TTL)
+        if use_cache and complete:
             await self.cache.set_search_results(query, response, limit)
         
         return response
@@ -98,35 +176,62 @@ class UnifiedSearchService:
         query: str,
         limit: int,
         sources: List[Any]
-    ) -> List[Dict[str, Any]]:
-        """Execute searches in parallel"""
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Execute searches in parallel
+        
+        Waits for every source up to SOFT_TIMEOUT. After that, returns as soon
+        as MIN_SOURCES have answered (or SEARCH_TIMEOUT passes) and cancels
+        the stragglers rather than letting the slowest API set the latency.
+        
+        Returns:
+            (papers, complete) - complete is False if any source was cut off
+        """
         # Create tasks for each source
         per_source_limit = max(20, limit // len(sources))
         
         tasks = [
-            source.search(query, limit=per_source_limit)
+            asyncio.create_task(source.search(query, limit=per_source_limit))
             for source in sources
         ]
+        quorum = min(self.MIN_SOURCES, len(tasks))
+        
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.SEARCH_TIMEOUT
         
-        # Execute in parallel with timeout
         try:
-            results = await asyncio.wait_for(
-                asyncio.gather(*tasks, return_exceptions=True),
-                timeout=30.0
-            )
-        except asyncio.TimeoutError:
-            print("Search timeout - returning partial results")
-            results = []
+            done, pending = await asyncio.wait(tasks, timeout=self.SOFT_TIMEOUT)
+            
+            # Past the soft deadline - stop at the first quorum of sources
+            while pending and len(done) < quorum:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                newly_done, pending = await asyncio.wait(
+                    pending,
+                    timeout=remaining,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                done |= newly_done
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+        
+        if pending:
+            logger.warning("Search timeout - returning partial results")
         
         # Flatten results and filter errors
         all_papers = []
-        for result in results:
-            if isinstance(result, list):
-                all_papers.extend(result)
-            elif isinstance(result, Exception):
-                print(f"Source error: {str(result)}")
+        for task in tasks:
+            if task not in done:
+                continue
+            if task.exception():
+                logger.warning("Source error", exc_info=task.exception())
+            else:
+                all_papers.extend(task.result())
         
-        return all_papers
+        return all_papers, not pending
     
     def _get_active_sources(self, source_names: Optional[List[str]] = None) -> List[Any]:
         """Get active source services"""
@@ -145,11 +250,11 @@ class UnifiedSearchService:
         self,
         paper_id: str,
         source: str,
-        db: Session
+        db: AsyncSession
     ) -> Optional[Dict[str, Any]]:
         """Get a specific paper by ID from a source"""
         # Check database first
-        db_paper = self._get_paper_from_db(paper_id, source, db)
+        db_paper = await self._get_paper_from_db(paper_id, source, db)
         if db_paper:
             return db_paper.to_dict()
         
@@ -162,16 +267,47 @@ class UnifiedSearchService:
         
         # Save to database
         if paper_data:
-            db_paper = self._save_paper_to_db(paper_data, db)
+            paper_data.pop("_key", None)
+            db_paper = await self._save_paper_to_db(paper_data, db)
             return db_paper.to_dict() if db_paper else paper_data
         
         return None
     
-    def _get_paper_from_db(
+    async def get_papers_by_ids(
+        self,
+        paper_ids: List[str],
+        source: str,
+        db: AsyncSession
+    ) -> Dict[str, Dict[str, Any]]:
+        """Get several papers by ID from a source, using its batch lookup"""
+        source_service = self._get_active_sources([source])
+        if not source_service:
+            return {}
+        
+        # Check database first
+        id_attr = f"{source}_id"
+        papers = {
+            getattr(paper, id_attr): paper.to_dict()
+            for paper in await self._get_papers_from_db(paper_ids, source, db)
+        }
+        
+        # Fetch the rest from the source in one batch
+        missing = [paper_id for paper_id in paper_ids if paper_id not in papers]
+        if missing:
+            fetched = await source_service[0].get_papers_by_ids(missing)
+            for paper in fetched.values():
+                paper.pop("_key", None)
+            if fetched:
+                await self.save_papers_to_db(list(fetched.values()), db)
+                papers.update(fetched)
+        
+        return papers
+    
+    async def _get_paper_from_db(
         self,
         paper_id: str,
         source: str,
-        db: Session
+        db: AsyncSession
     ) -> Optional[Paper]:
         """Get paper from database"""
         id_field_map = {
@@ -184,21 +320,50 @@ class UnifiedSearchService:
         if not id_field:
             return None
         
-        return db.query(Paper).filter(id_field == paper_id).first()
+        result = await db.execute(select(Paper).where(id_field == paper_id))
+        return result.scalars().first()
+    
+    async def _get_papers_from_db(
+        self,
+        paper_ids: List[str],
+        source: str,
+        db: AsyncSession
+    ) -> List[Paper]:
+        """Get papers from database by a list of source IDs"""
+        id_field_map = {
+            "arxiv": Paper.arxiv_id,
+            "semantic_scholar": Paper.semantic_scholar_id,
+            "openalex": Paper.openalex_id
+        }
+        
+        id_field = id_field_map.get(source)
+        if not id_field or not paper_ids:
+            return []
+        
+        result = await db.execute(select(Paper).where(id_field.in_(paper_ids)))
+        return list(result.scalars().all())
     
-    def _save_paper_to_db(self, paper_data: Dict[str, Any], db: Session) -> Optional[Paper]:
+    async def _save_paper_to_db(self, paper_data: Dict[str, Any], db: AsyncSession) -> Optional[Paper]:
         """Save paper to database"""
         try:
-            # Check if already exists by any ID
-            existing = db.query(Paper).filter(
-                (Paper.arxiv_id == paper_data.get("arxiv_id")) |
-                (Paper.doi == paper_data.get("doi")) |
-                (Paper.semantic_scholar_id == paper_data.get("semantic_scholar_id")) |
-                (Paper.openalex_id == paper_data.get("openalex_id"))
-            ).first()
+            # Check if already exists by any ID the paper actually has;
+            # one equality per indexed column lets Postgres BitmapOr the index scans
+            clauses = [
+                column == paper_data[field]
+                for field, column in (
+                    ("arxiv_id", Paper.arxiv_id),
+                    ("doi", Paper.doi),
+                    ("semantic_scholar_id", Paper.semantic_scholar_id),
+                    ("openalex_id", Paper.openalex_id)
+                )
+                if paper_data.get(field)
+            ]
             
-            if existing:
-                return existing
+            if clauses:
+                result = await db.execute(select(Paper).where(or_(*clauses)).limit(1))
+                existing = result.scalars().first()
+                if existing:
+                    return existing
             
             # Create new paper
             paper = Paper(
@@ -218,25 +383,58 @@ class UnifiedSearchService:
             )
             
             db.add(paper)
-            db.commit()
-            db.refresh(paper)
+            await db.commit()
+            await db.refresh(paper)
             
             return paper
             
-        except Exception as e:
-            db.rollback()
-            print(f"Error saving paper: {str(e)}")
+        except Exception:
+            await db.rollback()
+            logger.warning("Error saving paper", exc_info=True)
             return None
     
     async def save_papers_to_db(
         self,
         papers: List[Dict[str, Any]],
-        db: Session
-    ) -> List[Paper]:
-        """Batch save papers to database"""
-        saved = []
-        for paper_data in papers:
-            paper = self._save_paper_to_db(paper_data, db)
-            if paper:
-                saved.append(paper)
-        return saved
\ No newline at end of file
+        db: AsyncSession
+    ) -> int:
+        """
+        Batch save papers to database
+        
+        Inserts all papers in a single INSERT ... ON CONFLICT DO NOTHING
+        statement; papers already stored under any unique ID are skipped.
+        
+        Returns:
+            Number of newly inserted papers
+        """
+        if not papers:
+            return 0
+        
+        rows = [
+            {
+                "arxiv_id": paper_data.get("arxiv_id"),
+                "doi": paper_data.get("doi"),
+                "semantic_scholar_id": paper_data.get("semantic_scholar_id"),
+                "openalex_id": paper_data.get("openalex_id"),
+                "title": paper_data.get("title"),
+                "abstract": paper_data.get("abstract"),
+                "authors": paper_data.get("authors"),
+                "publication_date": paper_data.get("publication_date"),
+                "pdf_url": paper_data.get("pdf_url"),
+                "source": paper_data.get("source"),
+                "citation_count": paper_data.get("citation_count", 0),
+                "venue": paper_data.get("venue"),
+                "is_processed": False
+            }
+            for paper_data in papers
+        ]
+        stmt = insert(Paper).values(rows).on_conflict_do_nothing()
+        
+        try:
+            result = await db.execute(stmt)
+            await db.commit()
+            return result.rowcount
+        except Exception:
+            await db.rollback()
+            logger.warning("Error saving papers", exc_info=True)
+            return 0
\ No newline at end of file
@@ -1,23 +1,55 @@
+import logging
 import httpx
+import orjson
 from typing import List, Dict, Any, Optional
-from app.services.base_source import PaperSource
+from app.services.base_source import AsyncBaseStorage, PaperSource, compile_field_extractor
+
+logger = logging.getLogger(__name__)
+
+# Every field requested below comes back on each paper (null when unknown),
+# so the common case indexes keys directly instead of probing with .get()
+_extract_paper_fields = compile_field_extractor("_extract_paper_fields", [
+    ("title", "title", ""),
+    ("abstract", "abstract", ""),
+    ("pdf_url", ("openAccessPdf", "url"), None),
+    ("source_id", "paperId", None),
+    ("semantic_scholar_id", "paperId", None),
+    ("arxiv_id", ("externalIds", "ArXiv"), None),
+    ("doi", ("externalIds", "DOI"), None),
+    ("citation_count", "citationCount", 0),
+    ("venue", "venue", None),
+], strict=True)
 
 class SemanticScholarService(PaperSource):
     """Semantic Scholar API service"""
     
     BASE_URL = "https://api.semanticscholar.org/graph/v1"
+    BATCH_SIZE = 500  # Max IDs per /paper/batch request
+    # Batch and search calls multiplex over HTTP/2; keep a wide pool warm
+    CLIENT_LIMITS = httpx.Limits(max_keepalive_connections=50, max_connections=100, keepalive_expiry=60)
+    CLIENT_TIMEOUT = httpx.Timeout(30.0, connect=5.0)  # Fail fast when the API is unreachable
     
-    def __init__(self, api_key: Optional[str] = None):
-        super().__init__()
-        self.source_name = "semantic_scholar"
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        http_cache_storage: Optional[AsyncBaseStorage] = None
+    ):
         self.api_key = api_key
         self.headers = {}
         if api_key:
             self.headers["x-api-key"] = api_key
+        
+        # API key travels as a default header on the shared client
+        super().__init__(
+            http_cache_storage=http_cache_storage,
+            headers=self.headers,
+            base_url=self.BASE_URL
+        )
+        self.source_name = "semantic_scholar"
     
     async def search(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
         """Search Semantic Scholar papers"""
-        url = f"{self.BASE_URL}/paper/search"
+        url = "/paper/search"
         params = {
             "query": query,
             "limit": min(limit, 100),  # API max is 100
@@ -25,46 +57,83 @@ class SemanticScholarService(PaperSource):
         }
         
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(url, params=params, headers=self.headers)
-                response.raise_for_status()
-                
-                data = response.json()
-                papers = data.get("data", [])
-                
-                return [self.normalize_paper(paper) for paper in papers if paper]
-                
+            response = await self._request("GET", url, params=params)
+            
+            data = orjson.loads(response.content)
+            papers = data.get("data", [])
+            
+            return [self.normalize_paper(paper) for paper in papers if paper]
+            
         except httpx.HTTPStatusError as e:
             if e.response.status_code == 429:
-                print("Semantic Scholar rate limit hit")
+                logger.info("Semantic Scholar rate limit hit")
             else:
-                print(f"Semantic Scholar search error: {str(e)}")
+                logger.warning("Semantic Scholar search error", exc_info=True)
             return []
-        except Exception as e:
-            print(f"Semantic Scholar search error: {str(e)}")
+        except Exception:
+            logger.warning("Semantic Scholar search error", exc_info=True)
             return []
     
     async def get_paper_by_id(self, paper_id: str) -> Optional[Dict[str, Any]]:
         """Get paper by Semantic Scholar ID"""
-        url = f"{self.BASE_URL}/paper/{paper_id}"
+        url = f"/paper/{paper_id}"
         params = {
             "fields": "paperId,title,abstract,authors,year,citationCount,venue,openAccessPdf,externalIds"
         }
         
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(url, params=params, headers=self.headers)
-                response.raise_for_status()
-                
-                paper = response.json()
-                return self.normalize_paper(paper)
-                
-        except Exception as e:
-            print(f"Semantic Scholar get paper error: {str(e)}")
+            response = await self._request("GET", url, params=params)
+            
+            paper = orjson.loads(response.content)
+            return self.normalize_paper(paper)
+            
+        except Exception:
+            logger.warning("Semantic Scholar get paper error", exc_info=True)
             return None
     
+    async def get_papers_by_ids(self, paper_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get papers by Semantic Scholar IDs via the batch endpoint"""
+        url = "/paper/batch"
+        params = {
+            "fields": "paperId,title,abstract,authors,year,citationCount,venue,openAccessPdf,externalIds"
+        }
+        
+        papers = {}
+        for i in range(0, len(paper_ids), self.BATCH_SIZE):
+            chunk = paper_ids[i:i + self.BATCH_SIZE]
+            
+            try:
+                response = await self._request(
+                    "POST", url, params=params, json={"ids": chunk}
+                )
+                
+                # Results are positional; unknown IDs come back as null
+                for paper_id, raw in zip(chunk, orjson.loads(response.content)):
+                    if raw:
+                        papers[paper_id] = self.normalize_paper(raw)
+                        
+            except Exception:
+                logger.warning("Semantic Scholar batch get error", exc_info=True)
+        
+        return papers
+    
     def normalize_paper(self, raw_data: Dict[str, Any]) -> Dict[str, Any]:
         """Convert Semantic Scholar format to standard format"""
+        # Fast path for records that match the requested schema
+        try:
+            paper = _extract_paper_fields(raw_data)
+            paper["authors"] = [author["name"] for author in raw_data["authors"]]
+            year = raw_data["year"]
+        except (KeyError, TypeError):
+            return self._normalize_paper_generic(raw_data)
+        
+        paper["publication_date"] = self._parse_date(f"{year}-01-01") if year else None
+        paper["source"] = "semantic_scholar"
+        paper["_key"] = self._dedup_key(paper)
+        return paper
+    
+    def _normalize_paper_generic(self, raw_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a Semantic Scholar record with missing or malformed fields"""
         # Extract external IDs
         external_ids = raw_data.get("externalIds", {}) or {}
         arxiv_id = external_ids.get("ArXiv")
@@ -77,18 +146,16 @@ class SemanticScholarService(PaperSource):
             pdf_url = open_access.get("url")
         
         # Extract authors
-        authors = []
-        for author in raw_data.get("authors", []):
-            if isinstance(author, dict):
-                authors.append(author.get("name", "Unknown"))
-            else:
-                authors.append(str(author))
+        authors = [
+            author.get("name", "Unknown") if isinstance(author, dict) else str(author)
+            for author in raw_data.get("authors") or []
+        ]
         
         # Parse year to date
         year = raw_data.get("year")
         pub_date = self._parse_date(f"{year}-01-01") if year else None
         
-        return {
+        paper = {
             "title": raw_data.get("title", ""),
             "abstract": raw_data.get("abstract", ""),
             "authors": authors,
@@ -101,4 +168,6 @@ class SemanticScholarService(PaperSource):
             "doi": doi,
             "citation_count": raw_data.get("citationCount", 0),
             "venue": raw_data.get("venue")
-        }
\ No newline at end of file
+        }
+        paper["_key"] = self._dedup_key(paper)
+        return paper
@@ -156,8 +156,14 @@ async def run_all_tests():
 
 
 if __name__ == "__main__":
-    exit_code = asyncio.run(run_all_tests())
-    sys.exit(exit_code) not cache.is_connected():
+    # Prefer the libuv-backed loop when available
+    try:
+        import uvloop
+        run = uvloop.run
+    except ImportError:
+        run = asyncio.run
+    exit_code = run(run_all_tests())
+    sys.exit(exit_code) not await cache.is_connected():
             print("❌ Redis not connected - make sure Redis is running")
             return False
         
@@ -1,48 +1,149 @@
-import redis
-import json
-import hashlib
-from typing import Any, Optional
+import logging
+import redis.asyncio
+import hishel
+import ormsgpack
+import xxhash
+import zstandard
+from typing import Any, List, Optional
 from datetime import timedelta
- 
+from app.services.base_source import AsyncBaseStorage
+
+logger = logging.getLogger(__name__)
+
+# One-byte header in front of every cached payload
+FORMAT_MSGPACK = b"\x00"
+FORMAT_MSGPACK_ZSTD = b"\x01"
+
+
+class FailSafeStorage(AsyncBaseStorage):
+    """
+    HTTP cache storage that treats backend errors as cache misses
+    
+    Keeps upstream requests working while Redis is unavailable. The
+    storage is shared by every source client, so closing a client leaves
+    it open; call close() once on shutdown instead.
+    """
+    
+    def __init__(self, storage: AsyncBaseStorage):
+        super().__init__()
+        self._storage = storage
+    
+    async def store(self, key, response, request, metadata) -> None:
+        try:
+            await self._storage.store(key, response, request, metadata)
+        except Exception:
+            logger.warning("HTTP cache store error", exc_info=True)
+    
+    async def retrieve(self, key):
+        try:
+            return await self._storage.retrieve(key)
+        except Exception:
+            logger.warning("HTTP cache retrieve error", exc_info=True)
+            return None
+    
+    async def aclose(self) -> None:
+        """Leave the shared storage open when a client closes"""
+    
+    async def close(self) -> None:
+        """Close the underlying storage"""
+        await self._storage.aclose()
+
+
+def create_http_cache_storage(redis_url: str, ttl: int) -> FailSafeStorage:
+    """Create Redis-backed storage for caching raw HTTP responses from paper sources"""
+    return FailSafeStorage(hishel.AsyncRedisStorage(
+        client=redis.asyncio.from_url(redis_url),
+        ttl=ttl
+    ))
+
+
 class CacheService:
     """Redis cache service for search results"""
     
+    KEY_VERSION = "m1"  # Bump when the stored payload format changes
+    COMPRESS_THRESHOLD = 4096  # Bytes; smaller payloads aren't worth compressing
+    
     def __init__(self, redis_url: str):
         """Initialize Redis connection"""
-        self.redis_client = redis.from_url(
+        # Raw bytes in and out - payloads are MessagePack, zstd-compressed when large
+        self.redis_client = redis.asyncio.from_url(
             redis_url,
-            decode_responses=True,
+            decode_responses=False,
             socket_connect_timeout=5
         )
         self.default_ttl = 3600  # 1 hour
+        self._compressor = zstandard.ZstdCompressor(level=3)
+        self._decompressor = zstandard.ZstdDecompressor()
     
     def _generate_cache_key(self, prefix: str, query: str, **kwargs) -> str:
         """Generate a unique cache key from query and parameters"""
-        # Create a string from query and kwargs
-        key_parts = [prefix, query]
+        # Feed query and kwargs straight into a fast non-cryptographic hash
+        # (fixed-length key without building the joined string first)
+        key_hash = xxhash.xxh3_64()
+        key_hash.update(prefix.encode())
+        key_hash.update(b"|")
+        key_hash.update(query.encode())
         for k, v in sorted(kwargs.items()):
-            key_parts.append(f"{k}:{v}")
-        
-        key_string = "|".join(key_parts)
+            key_hash.update(f"|{k}:{v}".encode())
         
-        # Hash for consistent length
-        key_hash = hashlib.md5(key_string.encode()).hexdigest()
-        return f"{prefix}:{key_hash}"
+        return f"{prefix}:{self.KEY_VERSION}:{key_hash.hexdigest()}"
+    
+    def _encode(self, data: Any) -> bytes:
+        """Serialize a payload for Redis, compressing it if large"""
+        packed = ormsgpack.packb(data)
+        if len(packed) > self.COMPRESS_THRESHOLD:
+            return FORMAT_MSGPACK_ZSTD + self._compressor.compress(packed)
+        return FORMAT_MSGPACK + packed
+    
+    def _decode(self, data: bytes) -> Any:
+        """Deserialize a payload read from Redis (None for an unknown format)"""
+        header, body = data[:1], data[1:]
+        if header == FORMAT_MSGPACK_ZSTD:
+            return ormsgpack.unpackb(self._decompressor.decompress(body))
+        if header == FORMAT_MSGPACK:
+            return ormsgpack.unpackb(body)
+        return None
     
     async def get_search_results(self, query: str, limit: int = 20) -> Optional[dict]:
         """Get cached search results"""
         try:
             cache_key = self._generate_cache_key("search", query, limit=limit)
-            cached_data = self.redis_client.get(cache_key)
+            cached_data = await self.redis_client.get(cache_key)
             
             if cached_data:
-                return json.loads(cached_data)
+                return self._decode(cached_data)
             return None
             
-        except Exception as e:
-            print(f"Cache get error: {str(e)}")
+        except Exception:
+            logger.warning("Cache get error", exc_info=True)
             return None
     
+    async def mget_search_results(
+        self,
+        queries: List[str],
+        limit: int = 20
+    ) -> List[Optional[dict]]:
+        """
+        Get cached search results for several queries in one round trip
+        
+        Returns:
+            Results in the same order as queries (None for misses)
+        """
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for query in queries:
+                pipe.get(self._generate_cache_key("search", query, limit=limit))
+            raw = await pipe.execute()
+            
+            return [
+                self._decode(cached_data) if cached_data else None
+                for cached_data in raw
+            ]
+            
+        except Exception:
+            logger.warning("Cache mget error", exc_info=True)
+            return [None] * len(queries)
+    
     async def set_search_results(
         self, 
         query: str, 
@@ -55,40 +156,44 @@ class CacheService:
             cache_key = self._generate_cache_key("search", query, limit=limit)
             ttl = ttl or self.default_ttl
             
-            self.redis_client.setex(
+            await self.redis_client.setex(
                 cache_key,
                 ttl,
-                json.dumps(results)
+                self._encode(results)
             )
             return True
             
-        except Exception as e:
-            print(f"Cache set error: {str(e)}")
+        except Exception:
+            logger.warning("Cache set error", exc_info=True)
             return False
     
     async def invalidate_search(self, query: str, limit: int = 20) -> bool:
         """Invalidate specific search cache"""
         try:
             cache_key = self._generate_cache_key("search", query, limit=limit)
-            self.redis_client.delete(cache_key)
+            await self.redis_client.delete(cache_key)
             return True
-        except Exception as e:
-            print(f"Cache invalidate error: {str(e)}")
+        except Exception:
+            logger.warning("Cache invalidate error", exc_info=True)
             return False
     
     async def clear_all(self) -> bool:
         """Clear all cache (use with caution)"""
         try:
-            self.redis_client.flushdb()
+            await self.redis_client.flushdb()
             return True
-        except Exception as e:
-            print(f"Cache clear error: {str(e)}")
+        except Exception:
+            logger.warning("Cache clear error", exc_info=True)
             return False
     
-    def is_connected(self) -> bool:
+    async def close(self):
+        """Close the Redis connection pool"""
+        await self.redis_client.aclose()
+    
+    async def is_connected(self) -> bool:
         """Check if Redis is connected"""
         try:
-            self.redis_client.ping()
+            await self.redis_client.ping()
             return True
         except Exception:
             return False
@@ -1,13 +1,24 @@
-from typing import List, Dict, Any
-from difflib import SequenceMatcher
+import re
+import unicodedata
+from functools import lru_cache, reduce
+from typing import List, Dict, Any, Iterator, Optional
+from rapidfuzz import fuzz, process
+
+_NON_WORD_RE = re.compile(r"[\W_]+")
+
+# External IDs that identify the same work across sources; tracked under
+# namespaced keys like "doi:10.1000/xyz" so values from different schemes
+# can share one dict without colliding
+ID_FIELDS = ("doi", "arxiv_id", "semantic_scholar_id", "openalex_id")
+
 
 def deduplicate_papers(papers: List[Dict[str, Any]], similarity_threshold: float = 0.85) -> List[Dict[str, Any]]:
     """
     Deduplicate papers from multiple sources
     
     Strategy:
-    1. Group by exact ID matches (DOI, arXiv ID)
-    2. Group by similar titles (fuzzy matching)
+    1. Group by exact ID matches (DOI, arXiv, Semantic Scholar, OpenAlex)
+    2. Group the resulting records by similar titles (fuzzy matching)
     3. Merge metadata from multiple sources
     4. Prioritize: Semantic Scholar > arXiv > OpenAlex (for metadata quality)
     
@@ -21,72 +32,114 @@ def deduplicate_papers(papers: List[Dict[str, Any]], similarity_threshold: float
     if not papers:
         return []
     
-    # Track seen papers
-    seen_ids = {}
+    # Pass 1: merge papers sharing an exact ID; the resulting records are
+    # disjoint by ID, so the title pass below needs no ID lookups
+    clusters = _cluster_by_ids(papers)
+    
+    # Track seen titles (canonical title -> position in deduplicated)
     seen_titles = {}
     deduplicated = []
     
     # Source priority for metadata merging
     source_priority = {"semantic_scholar": 3, "arxiv": 2, "openalex": 1}
     
-    for paper in papers:
-        # Check for ID matches
-        matching_paper = None
-        
-        # Check DOI
-        if paper.get("doi"):
-            doi_key = paper["doi"].lower().strip()
-            if doi_key in seen_ids:
-                matching_paper = seen_ids[doi_key]
-        
-        # Check arXiv ID
-        if not matching_paper and paper.get("arxiv_id"):
-            arxiv_key = paper["arxiv_id"].lower().strip()
-            if arxiv_key in seen_ids:
-                matching_paper = seen_ids[arxiv_key]
-        
-        # Check Semantic Scholar ID
-        if not matching_paper and paper.get("semantic_scholar_id"):
-            ss_key = paper["semantic_scholar_id"].lower().strip()
-            if ss_key in seen_ids:
-                matching_paper = seen_ids[ss_key]
-        
-        # Check OpenAlex ID
-        if not matching_paper and paper.get("openalex_id"):
-            oa_key = paper["openalex_id"].lower().strip()
-            if oa_key in seen_ids:
-                matching_paper = seen_ids[oa_key]
+    def merge(paper1, paper2):
+        return _merge_papers(paper1, paper2, source_priority)
+    
+    for cluster in clusters:
+        paper = reduce(merge, (papers[i] for i in cluster))
         
-        # Check title similarity
-        if not matching_paper:
-            title = paper.get("title", "").lower().strip()
-            if title:
-                for existing_title, existing_paper in seen_titles.items():
-                    similarity = _title_similarity(title, existing_title)
-                    if similarity >= similarity_threshold:
-                        matching_paper = existing_paper
-                        break
+        # Pass 2: match the record against earlier ones by title
+        idx = _find_duplicate(paper, seen_titles, similarity_threshold)
         
         # If duplicate found, merge metadata
-        if matching_paper:
-            merged = _merge_papers(matching_paper, paper, source_priority)
+        if idx is not None:
             # Update in place
-            idx = deduplicated.index(matching_paper)
-            deduplicated[idx] = merged
-            
-            # Update tracking dictionaries
-            _update_tracking(merged, seen_ids, seen_titles)
+            deduplicated[idx] = merge(deduplicated[idx], paper)
         else:
             # New unique paper
+            idx = len(deduplicated)
             deduplicated.append(paper)
-            _update_tracking(paper, seen_ids, seen_titles)
+        
+        # Update tracking dictionaries
+        _update_tracking(deduplicated[idx], idx, seen_titles)
     
     return deduplicated
 
 
-def _title_similarity(title1: str, title2: str) -> float:
-    """Calculate similarity between two titles"""
-    return SequenceMatcher(None, title1, title2).ratio()
+def _cluster_by_ids(papers: List[Dict[str, Any]]) -> List[List[int]]:
+    """
+    Group papers that share any exact ID, using union-find
+    
+    Returns:
+        Lists of positions into papers, ordered by first appearance
+    """
+    parent = list(range(len(papers)))
+    
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]  # Path halving
+            i = parent[i]
+        return i
+    
+    # Union each paper with the first paper seen carrying the same ID;
+    # the lower position becomes the root so clusters keep input order
+    first_seen = {}
+    for i, paper in enumerate(papers):
+        for id_key in _id_keys(paper):
+            j = first_seen.setdefault(id_key, i)
+            if j != i:
+                root_i, root_j = find(i), find(j)
+                if root_i != root_j:
+                    parent[max(root_i, root_j)] = min(root_i, root_j)
+    
+    clusters = {}
+    for i in range(len(papers)):
+        clusters.setdefault(find(i), []).append(i)
+    return list(clusters.values())
+
+
+def _id_keys(paper: Dict[str, Any]) -> Iterator[str]:
+    """Yield the paper's precomputed key and namespaced external IDs"""
+    if paper.get("_key"):
+        yield paper["_key"]
+    for id_field in ID_FIELDS:
+        value = paper.get(id_field)
+        if value:
+            yield f"{id_field}:{value.lower().strip()}"
+
+
+def _find_duplicate(
+    paper: Dict[str, Any],
+    seen_titles: Dict,
+    similarity_threshold: float
+) -> Optional[int]:
+    """Find the position of an already-seen paper whose title matches this one"""
+    # Check title: exact canonical match first, fuzzy only on a miss
+    title = _canon_title(paper.get("title") or "")
+    if not title:
+        return None
+    if title in seen_titles:
+        return seen_titles[title]
+    
+    # fuzz.ratio can't exceed 2*min(len1, len2) / (len1 + len2), so skip
+    # titles whose length alone rules out reaching the threshold
+    length = len(title)
+    candidates = [
+        c for c in seen_titles
+        if 2 * min(length, len(c)) >= similarity_threshold * (length + len(c)) - 1e-9
+    ]
+    if not candidates:
+        return None
+    
+    match = process.extractOne(
+        title,
+        candidates,
+        scorer=fuzz.ratio,
+        processor=None,
+        score_cutoff=similarity_threshold * 100
+    )
+    return seen_titles[match[0]] if match else None
 
 
 def _merge_papers(paper1: Dict[str, Any], paper2: Dict[str, Any], source_priority: Dict[str, int]) -> Dict[str, Any]:
@@ -111,7 +164,7 @@ def _merge_papers(paper1: Dict[str, Any], paper2: Dict[str, Any], source_priorit
     merged = primary.copy()
     
     # Merge IDs (collect all)
-    for id_field in ["arxiv_id", "doi", "semantic_scholar_id", "openalex_id"]:
+    for id_field in ID_FIELDS:
         if not merged.get(id_field) and secondary.get(id_field):
             merged[id_field] = secondary[id_field]
     
@@ -142,19 +195,18 @@ def _merge_papers(paper1: Dict[str, Any], paper2: Dict[str, Any], source_priorit
     return merged
 
 
-def _update_tracking(paper: Dict[str, Any], seen_ids: Dict, seen_titles: Dict):
-    """Update tracking dictionaries with paper IDs and title"""
-    # Track by IDs
-    if paper.get("doi"):
-        seen_ids[paper["doi"].lower().strip()] = paper
-    if paper.get("arxiv_id"):
-        seen_ids[paper["arxiv_id"].lower().strip()] = paper
-    if paper.get("semantic_scholar_id"):
-        seen_ids[paper["semantic_scholar_id"].lower().strip()] = paper
-    if paper.get("openalex_id"):
-        seen_ids[paper["openalex_id"].lower().strip()] = paper
-    
+def _update_tracking(paper: Dict[str, Any], idx: int, seen_titles: Dict):
+    """Update tracking dictionaries with paper title and its position"""
     # Track by title
-    title = paper.get("title", "").lower().strip()
+    title = _canon_title(paper.get("title") or "")
     if title:
-        seen_titles[title] = paper
\ No newline at end of file
+        seen_titles[title] = idx
+
+
+@lru_cache(maxsize=4096)
+def _canon_title(title: str) -> str:
+    """Canonical title form: accents stripped, lowercase, no punctuation, single spaces"""
+    title = "".join(
+        ch for ch in unicodedata.normalize("NFKD", title) if not unicodedata.combining(ch)
+    ).lower()
+    return " ".join(_NON_WORD_RE.sub(" ", title).split())
\ No newline at end of file